@@ -11,25 +11,41 @@ from __future__ import annotations
 import argparse
 import logging
 import mimetypes
+import os
 import re
+import shutil
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 THIS_FILE = Path(__file__).resolve()
-IGNORE_EXTENSIONS = [
-    ".bmp",
-    ".geoh5",
-    ".gif",
-    ".h5",
-    ".ico",
-    ".jpeg",
-    ".jpg",
-    ".png",
-    ".pt",
-    ".pynb",
-]
+IGNORE_EXTENSIONS = frozenset(
+    {
+        ".bmp",
+        ".geoh5",
+        ".gif",
+        ".h5",
+        ".ico",
+        ".jpeg",
+        ".jpg",
+        ".png",
+        ".pt",
+        ".pynb",
+    }
+)
+MY_APP_PATTERN = re.compile(r"\bmy([-_])app\b")
+
+
+@lru_cache(maxsize=None)
+def is_image_suffix(suffixes: str) -> bool:
+    """Check if mimetypes guesses an image type from the given chain of file suffixes."""
+
+    mimetype, _ = mimetypes.guess_type(f"x{suffixes}", strict=False)
+    return mimetype is not None and mimetype.startswith("image")
 
 
 def dash_to_underscore(name: str) -> str:
@@ -51,43 +67,84 @@ class MyAppRenamer:
     def __init__(self, newname: str):
         """:param newname: The new name to replace 'my-app' and 'my_app' with."""
 
-        self.root = Path(__file__).parents[1]
+        self.root = THIS_FILE.parents[1]
         self.newname = underscore_to_dash(newname)
         self.newname_underscore = dash_to_underscore(newname)
 
         logger.info(f"new name={self.newname}")
         logger.info(f"new name with underscores={self.newname_underscore}")
 
-    def replace_in_file(self, filepath: Path) -> None:
+    def _replacement(self, match: re.Match) -> str:
+        """Pick the dash or underscore flavour of the new name from the matched separator."""
+
+        return self.newname if match.group(1) == "-" else self.newname_underscore
+
+    def replace_in_file(self, filepath: Path) -> Path | None:
+        """Patch the file in place and return its path, or None if it was left unchanged."""
+
         logger.debug(f"reading {filepath} ...")
-        with open(filepath, encoding="utf-8") as file:
-            content: str = file.read()
-            patched_content = re.sub(r"\bmy-app\b", self.newname, content)
-            patched_content = re.sub(
-                r"\bmy_app\b", self.newname_underscore, patched_content
-            )
-        if patched_content != content:
-            logger.info(f"patching {filepath}")
-            with open(filepath, "w", encoding="utf-8") as file:
-                file.write(patched_content)
+        raw = filepath.read_bytes()
+        # cheap substring check to skip decoding and regex on most files
+        if b"my-app" not in raw and b"my_app" not in raw:
+            return None
+
+        content = raw.decode("utf-8")
+        patched_content, count = MY_APP_PATTERN.subn(self._replacement, content)
+        if count == 0:
+            return None
+
+        logger.info(f"patching {filepath}")
+        self._write_atomic(filepath, patched_content.encode("utf-8"))
+        return filepath
+
+    @staticmethod
+    def _write_atomic(filepath: Path, data: bytes) -> None:
+        """Write to a temporary file next to the target, then swap it in place."""
+
+        fd, tmp_name = tempfile.mkstemp(
+            dir=filepath.parent, prefix=f".{filepath.name}."
+        )
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            shutil.copymode(filepath, tmp_name)
+            os.replace(tmp_name, filepath)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
 
     def get_non_image_files(self) -> list[Path]:
         """Return the list of files tracked by git that are not images, according to mimetypes."""
 
-        tracked_files = subprocess.run(
-            ["git", "ls-files"], cwd=self.root, capture_output=True, encoding="utf-8"
-        ).stdout.splitlines()
-
         def is_image(p: Path) -> bool:
-            mimetype, _ = mimetypes.guess_type(p, strict=False)
-            return mimetype is not None and mimetype.startswith("image")
+            return is_image_suffix("".join(p.suffixes))
 
-        paths = [Path(file) for file in tracked_files]
-        return [p.resolve() for p in paths if p.is_file() and not is_image(p)]
+        # root is already resolved: joining avoids a symlink walk per file.
+        # Tracked symlinks are skipped, their tracked targets are patched on their own.
+        paths = (self.root / file for file in self.get_tracked_files())
+        return [
+            p for p in paths if p.is_file() and not p.is_symlink() and not is_image(p)
+        ]
+
+    def get_tracked_files(self) -> list[str]:
+        """Return the files tracked by git."""
+
+        ls_files = subprocess.run(
+            ["git", "ls-files", "-z"], cwd=self.root, stdout=subprocess.PIPE
+        )
+        if ls_files.returncode != 0:
+            logger.error(f"git ls-files failed with exit code {ls_files.returncode}.")
+            exit(1)
+
+        return [os.fsdecode(name) for name in ls_files.stdout.split(b"\0") if name]
 
     def run(self):
         """Applies the renaming across files and directories."""
 
+        if self.newname_underscore == "my_app":
+            logger.info("The new name is the same as the current one: nothing to do.")
+            return
+
         if (self.root / self.newname_underscore).exists():
             logger.error(
                 f"Cannot rename to {self.newname_underscore} because this folder already exists."
@@ -101,14 +158,17 @@ class MyAppRenamer:
             )
             exit(1)
 
-        status_lines = subprocess.run(
+        status_output = subprocess.run(
             ["git", "status", "--short", "."],
             cwd=self.root,
             capture_output=True,
-            encoding="utf-8",
-        ).stdout.splitlines()
-        # exclude untracked files
-        status_lines = [line for line in status_lines if not line.startswith("?")]
+        ).stdout
+        # exclude untracked files, and only decode what is left
+        status_lines = [
+            os.fsdecode(line)
+            for line in status_output.splitlines()
+            if not line.startswith(b"?")
+        ]
 
         has_uncommitted_changes = len(status_lines) > 0
         if has_uncommitted_changes:
@@ -123,11 +183,27 @@ class MyAppRenamer:
                 logger.info("Aborting.")
                 exit(1)
 
-        for f in self.get_non_image_files():
-            if not self.should_skip(f):
-                self.replace_in_file(f)
-
-        subprocess.run(["git", "add", "-u", "."], cwd=self.root)
+        files_to_process = [
+            f for f in self.get_non_image_files() if not self.should_skip(f)
+        ]
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            patched_files = [
+                p for p in executor.map(self.replace_in_file, files_to_process) if p
+            ]
+
+        if patched_files:
+            # only stage the patched files, passed through stdin to stay clear of ARG_MAX
+            update_index = subprocess.run(
+                ["git", "update-index", "--add", "-z", "--stdin"],
+                cwd=self.root,
+                input=b"\0".join(os.fsencode(p) for p in patched_files),
+            )
+            if update_index.returncode != 0:
+                logger.error(
+                    "Failed to stage the patched files "
+                    f"(git update-index exit code {update_index.returncode})."
+                )
+                exit(1)
 
         subprocess.run(["git", "mv", "my_app", self.newname_underscore], cwd=self.root)
         subprocess.run(
@@ -6,11 +6,13 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 
 __version__ = "0.1.0-alpha.1"
 
 
+@lru_cache(maxsize=1)
 def assets_path() -> Path:
     """Return the path to the assets folder."""
 
@@ -15,3 +15,7 @@ def test_assets_directory_exist():
 def test_uijson_files_exists():
     assert (assets_path() / "uijson").is_dir()
     assert list((assets_path() / "uijson").iterdir())[0].is_file()
+
+
+def test_assets_path_is_cached():
+    assert assets_path() is assets_path()